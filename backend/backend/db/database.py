@@ -8,13 +8,16 @@ from sqlalchemy import (
     Column,
     DateTime,
     ForeignKey,
+    Index,
     Integer,
     String,
     UniqueConstraint,
     create_engine,
     func,
+    make_url,
 )
 from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
@@ -32,6 +35,19 @@ def get_db():
     finally:
         db.close()
 
+# asyncpg engine for async routes and background tasks, so waiting on the DB
+# doesn't tie up a threadpool worker
+async_engine = create_async_engine(
+    make_url(SQLALCHEMY_DATABASE_URL).set(drivername="postgresql+asyncpg"),
+)
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, autoflush=False, expire_on_commit=False
+)
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
 
 # SQLAlchemy models
 Base = declarative_base()
@@ -63,7 +79,11 @@ class CompanyCollectionAssociation(Base):
     __tablename__ = "company_collection_associations"
 
     __table_args__ = (
+        # Also backs ON CONFLICT (company_id, collection_id)
         UniqueConstraint('company_id', 'collection_id', name='uq_company_collection'),
+        # Lets collection scans ordered by company_id (paging, bulk copy) run as
+        # index-only scans instead of sorting heap rows
+        Index('ix_collection_company', 'collection_id', 'company_id'),
     )
     
     created_at: Union[datetime, Column[datetime]] = Column(
@@ -73,3 +93,18 @@ class CompanyCollectionAssociation(Base):
     company_id = Column(Integer, ForeignKey("companies.id"))
     collection_id = Column(UUID(as_uuid=True), ForeignKey("company_collections.id"))
 
+class BackgroundTask(Base):
+    __tablename__ = "background_tasks"
+
+    id: Column[uuid.UUID] = Column(UUID(as_uuid=True), primary_key=True)
+    status = Column(String, nullable=False)
+    progress_current = Column(Integer)
+    progress_total = Column(Integer)
+    message = Column(String)
+    error = Column(String)
+    created_at: Union[datetime, Column[datetime]] = Column(
+        DateTime(timezone=True), nullable=False
+    )
+    updated_at: Union[datetime, Column[datetime]] = Column(
+        DateTime(timezone=True), nullable=False, index=True
+    )
@@ -0,0 +1,86 @@
+"""Short-lived in-memory cache for read-heavy API responses."""
+import os
+import threading
+import time
+from typing import Any, Hashable, Optional
+
+
+class ResponseCache:
+    """TTL cache keyed by tuples, with prefix-based invalidation.
+
+    Keys are hierarchical tuples such as ``("collections", collection_id, offset,
+    limit)``, so a write can drop every cached view under ``("collections",)`` at
+    once. Invalidation only reaches the current process, so the global instance
+    is disabled when ``TASK_BACKEND=database`` marks a multi-worker deployment;
+    otherwise a write on one worker would leave other workers serving stale pages.
+
+    Every invalidation bumps ``generation``. Readers take it before querying and
+    pass it to ``set``, which skips the write if an invalidation happened in
+    between, so a slow read can't re-cache data a concurrent write made stale.
+    """
+
+    def __init__(self, max_entries: int = 1024, enabled: bool = True):
+        self._enabled = enabled
+        self._entries: dict[tuple[Hashable, ...], tuple[float, Any]] = {}
+        self._max_entries = max_entries
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    @property
+    def generation(self) -> int:
+        """Counter bumped by every invalidation."""
+        return self._generation
+
+    def get(self, key: tuple[Hashable, ...]) -> Optional[Any]:
+        """Get a cached value, or None if it is missing or expired."""
+        if not self._enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            return value
+
+    def set(
+        self,
+        key: tuple[Hashable, ...],
+        value: Any,
+        max_age: float,
+        generation: Optional[int] = None,
+    ) -> None:
+        """Cache a value for max_age seconds.
+
+        If generation is given and an invalidation happened since it was read,
+        the value may already be stale and is not cached.
+        """
+        if not self._enabled:
+            return
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+
+            # Drop expired entries so keys that are never read again don't
+            # accumulate, then evict the oldest entries if still at capacity
+            now = time.monotonic()
+            for k in [k for k, (expires_at, _) in self._entries.items() if expires_at <= now]:
+                del self._entries[k]
+            self._entries.pop(key, None)
+            while len(self._entries) >= self._max_entries:
+                del self._entries[next(iter(self._entries))]
+
+            self._entries[key] = (now + max_age, value)
+
+    def invalidate(self, *prefix: Hashable) -> None:
+        """Drop every entry whose key starts with prefix."""
+        with self._lock:
+            self._generation += 1
+            for key in [k for k in self._entries if k[: len(prefix)] == prefix]:
+                del self._entries[key]
+
+
+# Global response cache instance
+response_cache = ResponseCache(enabled=os.getenv("TASK_BACKEND", "memory") != "database")
@@ -1,10 +1,26 @@
-"""Background task management for long-running operations."""
+"""Background task management for long-running operations.
+
+Tasks live in-process by default. Set ``TASK_BACKEND=database`` to keep them in
+Postgres instead, so that any worker can answer a ``GET /tasks/{id}`` poll when
+the API runs with more than one uvicorn/gunicorn worker.
+"""
+import os
+import threading
+import time
 import uuid
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 from enum import Enum
-from typing import Optional
+from typing import Optional, Protocol
 
 from pydantic import BaseModel
+from sqlalchemy import case, delete, update
+from starlette.concurrency import run_in_threadpool
+
+from backend.db import database
+
+
+# How long the database backend keeps a task after its last update
+TASK_TTL = timedelta(hours=24)
 
 
 class TaskStatus(str, Enum):
@@ -32,16 +48,220 @@ class Task(BaseModel):
     updated_at: datetime
 
 
-class TaskStore:
-    """In-memory store for background tasks."""
+class TaskBackend(Protocol):
+    """Storage used by TaskStore."""
+
+    def get(self, task_id: uuid.UUID) -> Optional[Task]: ...
+
+    def set(self, task: Task) -> None: ...
+
+    def update(
+        self,
+        task_id: uuid.UUID,
+        status: Optional[TaskStatus] = None,
+        current: Optional[int] = None,
+        message: Optional[str] = None,
+        error: Optional[str] = None,
+    ) -> bool: ...
+
+
+class _TaskRecord:
+    """Mutable state of an in-memory task, only touched while holding its lock."""
+
+    __slots__ = (
+        "id",
+        "status",
+        "current",
+        "total",
+        "message",
+        "error",
+        "created_at",
+        "updated_ns",
+        "lock",
+    )
+
+    def __init__(self, task: Task):
+        self.id = task.id
+        self.status = task.status
+        self.current = task.progress.current if task.progress else None
+        self.total = task.progress.total if task.progress else None
+        self.message = task.message
+        self.error = task.error
+        self.created_at = task.created_at
+        # Kept as epoch nanoseconds so updates only store an int; converted to a
+        # datetime when a snapshot is taken
+        self.updated_ns = round(task.updated_at.timestamp() * 1_000_000) * 1_000
+        self.lock = threading.Lock()
+
+    def snapshot(self) -> Task:
+        """Copy the current state into a fresh Task; call with the lock held."""
+        progress = None
+        if self.total is not None:
+            progress = TaskProgress.model_construct(current=self.current, total=self.total)
+        return Task.model_construct(
+            id=self.id,
+            status=self.status,
+            progress=progress,
+            message=self.message,
+            error=self.error,
+            created_at=self.created_at,
+            updated_at=_datetime_from_ns(self.updated_ns),
+        )
+
+
+class InMemoryTaskBackend:
+    """Keeps tasks in a dict; only visible to the current process.
+
+    Each task is a lock-guarded record and readers get a snapshot copy, so a poll
+    serializing a task never sees a half-applied update from the worker.
+    """
 
     def __init__(self):
-        self._tasks: dict[uuid.UUID, Task] = {}
+        self._tasks: dict[uuid.UUID, _TaskRecord] = {}
+
+    def get(self, task_id: uuid.UUID) -> Optional[Task]:
+        record = self._tasks.get(task_id)
+        if not record:
+            return None
+        with record.lock:
+            return record.snapshot()
+
+    def set(self, task: Task) -> None:
+        self._tasks[task.id] = _TaskRecord(task)
+
+    def update(
+        self,
+        task_id: uuid.UUID,
+        status: Optional[TaskStatus] = None,
+        current: Optional[int] = None,
+        message: Optional[str] = None,
+        error: Optional[str] = None,
+    ) -> bool:
+        record = self._tasks.get(task_id)
+        if not record:
+            return False
+
+        with record.lock:
+            if status is not None:
+                record.status = status
+            if current is not None and record.total is not None:
+                record.current = current
+            if message is not None:
+                record.message = message
+            if error is not None:
+                record.error = error
+
+            record.updated_ns = time.time_ns()
+        return True
+
+
+class DatabaseTaskBackend:
+    """Keeps tasks in the ``background_tasks`` table, shared by all workers.
+
+    Tasks not updated for ``TASK_TTL`` are deleted whenever a new task is stored.
+    """
+
+    def get(self, task_id: uuid.UUID) -> Optional[Task]:
+        db = database.SessionLocal()
+        try:
+            row = db.get(database.BackgroundTask, task_id)
+            return _task_from_row(row) if row else None
+        finally:
+            db.close()
+
+    def set(self, task: Task) -> None:
+        table = database.BackgroundTask.__table__
+        db = database.SessionLocal()
+        try:
+            db.execute(
+                delete(table).where(
+                    table.c.updated_at < datetime.now(timezone.utc) - TASK_TTL
+                )
+            )
+            db.merge(
+                database.BackgroundTask(
+                    id=task.id,
+                    status=task.status.value,
+                    progress_current=task.progress.current if task.progress else None,
+                    progress_total=task.progress.total if task.progress else None,
+                    message=task.message,
+                    error=task.error,
+                    created_at=task.created_at,
+                    updated_at=task.updated_at,
+                )
+            )
+            db.commit()
+        finally:
+            db.close()
+
+    def update(
+        self,
+        task_id: uuid.UUID,
+        status: Optional[TaskStatus] = None,
+        current: Optional[int] = None,
+        message: Optional[str] = None,
+        error: Optional[str] = None,
+    ) -> bool:
+        # A single UPDATE, so concurrent writers never read-modify-write over
+        # each other
+        table = database.BackgroundTask.__table__
+        values = {"updated_at": datetime.now(timezone.utc)}
+        if status is not None:
+            values["status"] = status.value
+        if current is not None:
+            # Like the in-memory backend, only tasks with a total track progress
+            values["progress_current"] = case(
+                (table.c.progress_total.is_(None), table.c.progress_current),
+                else_=current,
+            )
+        if message is not None:
+            values["message"] = message
+        if error is not None:
+            values["error"] = error
+
+        db = database.SessionLocal()
+        try:
+            result = db.execute(
+                update(table).where(table.c.id == task_id).values(**values)
+            )
+            db.commit()
+            return result.rowcount > 0
+        finally:
+            db.close()
+
+
+def _datetime_from_ns(timestamp_ns: int) -> datetime:
+    return datetime.fromtimestamp(timestamp_ns / 1e9, tz=timezone.utc)
+
+
+def _task_from_row(row) -> Task:
+    progress = None
+    if row.progress_total is not None:
+        progress = TaskProgress(current=row.progress_current or 0, total=row.progress_total)
+    return Task(
+        id=row.id,
+        status=TaskStatus(row.status),
+        progress=progress,
+        message=row.message,
+        error=row.error,
+        created_at=row.created_at,
+        updated_at=row.updated_at,
+    )
+
+
+class TaskStore:
+    """Store for background tasks, backed by a TaskBackend."""
+
+    def __init__(self, backend: Optional[TaskBackend] = None):
+        self._backend = backend if backend is not None else InMemoryTaskBackend()
+        # In-process lookups are a dict access and safe to call on the event loop;
+        # other backends do blocking I/O and go through the threadpool instead
+        self._in_process = isinstance(self._backend, InMemoryTaskBackend)
 
     def create_task(self, total_items: int, message: str = "Processing...") -> Task:
         """Create a new task."""
         task_id = uuid.uuid4()
-        now = datetime.utcnow()
+        now = datetime.now(timezone.utc)
         task = Task(
             id=task_id,
             status=TaskStatus.PENDING,
@@ -50,12 +270,12 @@ class TaskStore:
             created_at=now,
             updated_at=now,
         )
-        self._tasks[task_id] = task
+        self._backend.set(task)
         return task
 
     def get_task(self, task_id: uuid.UUID) -> Optional[Task]:
         """Get a task by ID."""
-        return self._tasks.get(task_id)
+        return self._backend.get(task_id)
 
     def update_task(
         self,
@@ -64,24 +284,38 @@ class TaskStore:
         current: Optional[int] = None,
         message: Optional[str] = None,
         error: Optional[str] = None,
-    ) -> Optional[Task]:
-        """Update a task's status and progress."""
-        task = self._tasks.get(task_id)
-        if not task:
-            return None
+    ) -> bool:
+        """Update a task's status and progress; returns False if it doesn't exist."""
+        return self._backend.update(
+            task_id, status=status, current=current, message=message, error=error
+        )
 
-        if status is not None:
-            task.status = status
-        if current is not None and task.progress:
-            task.progress.current = current
-        if message is not None:
-            task.message = message
-        if error is not None:
-            task.error = error
+    async def get_task_async(self, task_id: uuid.UUID) -> Optional[Task]:
+        """Get a task by ID without blocking the event loop."""
+        if self._in_process:
+            return self.get_task(task_id)
+        return await run_in_threadpool(self.get_task, task_id)
 
-        task.updated_at = datetime.utcnow()
-        return task
+    async def update_task_async(
+        self,
+        task_id: uuid.UUID,
+        status: Optional[TaskStatus] = None,
+        current: Optional[int] = None,
+        message: Optional[str] = None,
+        error: Optional[str] = None,
+    ) -> bool:
+        """Update a task's status and progress without blocking the event loop."""
+        kwargs = dict(status=status, current=current, message=message, error=error)
+        if self._in_process:
+            return self.update_task(task_id, **kwargs)
+        return await run_in_threadpool(self.update_task, task_id, **kwargs)
+
+
+def _create_task_backend() -> TaskBackend:
+    if os.getenv("TASK_BACKEND", "memory") == "database":
+        return DatabaseTaskBackend()
+    return InMemoryTaskBackend()
 
 
 # Global task store instance
-task_store = TaskStore()
+task_store = TaskStore(_create_task_backend())
@@ -1,12 +1,15 @@
+import time
 import uuid
 
 from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query
 from pydantic import BaseModel
-from sqlalchemy import func, text
-from sqlalchemy.exc import IntegrityError
+from sqlalchemy import Integer, any_, bindparam, func, select, text
+from sqlalchemy.dialects.postgresql import ARRAY, UUID
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from backend.db import database
+from backend.models.cache import response_cache
 from backend.models.tasks import TaskStatus, task_store
 from backend.routes.companies import (
     CompanyBatchOutput,
@@ -28,49 +31,109 @@ class CompanyCollectionOutput(CompanyBatchOutput, CompanyCollectionMetadata):
     pass
 
 
+# How long GET responses are cached; any write to a collection drops them early
+COLLECTIONS_CACHE_MAX_AGE = 30
+COLLECTION_PAGE_CACHE_MAX_AGE = 10
+
+
 @router.get("", response_model=list[CompanyCollectionMetadata])
 def get_all_collection_metadata(
     db: Session = Depends(database.get_db),
 ):
+    cache_key = ("collections",)
+    cached = response_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    generation = response_cache.generation
+
     collections = db.query(database.CompanyCollection).all()
 
-    return [
-        CompanyCollectionMetadata(
+    output = [
+        CompanyCollectionMetadata.model_construct(
             id=collection.id,
             collection_name=collection.collection_name,
         )
         for collection in collections
     ]
+    response_cache.set(
+        cache_key, output, max_age=COLLECTIONS_CACHE_MAX_AGE, generation=generation
+    )
+    return output
+
+
+# Only the page's company IDs are needed; fetch_companies_with_liked loads the
+# companies themselves, so there is no need to join them in. COUNT(*) OVER ()
+# returns the total alongside the page in one round-trip.
+_collection_page_stmt = (
+    select(
+        database.CompanyCollectionAssociation.company_id,
+        func.count().over().label("total"),
+    )
+    .where(
+        database.CompanyCollectionAssociation.collection_id
+        == bindparam("collection_id")
+    )
+    .order_by(database.CompanyCollectionAssociation.company_id)
+    .offset(bindparam("offset"))
+    .limit(bindparam("limit"))
+)
+_collection_count_stmt = (
+    select(func.count())
+    .select_from(database.CompanyCollectionAssociation)
+    .where(
+        database.CompanyCollectionAssociation.collection_id
+        == bindparam("collection_id")
+    )
+)
 
 
 @router.get("/{collection_id}", response_model=CompanyCollectionOutput)
-def get_company_collection_by_id(
+async def get_company_collection_by_id(
     collection_id: uuid.UUID,
     offset: int = Query(
         0, description="The number of items to skip from the beginning"
     ),
     limit: int = Query(10, description="The number of items to fetch"),
-    db: Session = Depends(database.get_db),
+    db: AsyncSession = Depends(database.get_async_db),
 ):
-    query = (
-        db.query(database.CompanyCollectionAssociation, database.Company)
-        .join(database.Company)
-        .filter(database.CompanyCollectionAssociation.collection_id == collection_id)
-    )
+    cache_key = ("collections", collection_id, offset, limit)
+    cached = response_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    generation = response_cache.generation
+
+    collection = await db.get(database.CompanyCollection, collection_id)
+    if not collection:
+        raise HTTPException(status_code=404, detail="Collection not found")
 
-    total_count = query.with_entities(func.count()).scalar()
+    results = (
+        await db.execute(
+            _collection_page_stmt,
+            {"collection_id": collection_id, "offset": offset, "limit": limit},
+        )
+    ).all()
+    if results:
+        total_count = results[0].total
+    else:
+        # Empty page (past the end, or limit=0), so no row carries the total
+        total_count = await db.scalar(
+            _collection_count_stmt, {"collection_id": collection_id}
+        )
 
-    results = query.offset(offset).limit(limit).all()
-    companies = fetch_companies_with_liked(db, [company.id for _, company in results])
+    companies = await db.run_sync(
+        fetch_companies_with_liked, [company_id for company_id, _ in results]
+    )
 
-    return CompanyCollectionOutput(
+    output = CompanyCollectionOutput(
         id=collection_id,
-        collection_name=db.query(database.CompanyCollection)
-        .get(collection_id)
-        .collection_name,
+        collection_name=collection.collection_name,
         companies=companies,
         total=total_count,
     )
+    response_cache.set(
+        cache_key, output, max_age=COLLECTION_PAGE_CACHE_MAX_AGE, generation=generation
+    )
+    return output
 
 
 class AddCompaniesRequest(BaseModel):
@@ -84,6 +147,25 @@ class AddCompaniesResponse(BaseModel):
     duplicates_count: int
 
 
+_count_companies_stmt = (
+    select(func.count())
+    .select_from(database.Company)
+    .where(database.Company.id == any_(bindparam("company_ids", type_=ARRAY(Integer))))
+)
+_add_companies_stmt = text(
+    """
+    INSERT INTO company_collection_associations (company_id, collection_id)
+    SELECT company_id, CAST(:collection_id AS uuid)
+    FROM unnest(CAST(:company_ids AS integer[])) AS ids(company_id)
+    ON CONFLICT (company_id, collection_id) DO NOTHING
+    RETURNING company_id
+    """
+).bindparams(
+    bindparam("collection_id", type_=UUID(as_uuid=True)),
+    bindparam("company_ids", type_=ARRAY(Integer)),
+)
+
+
 @router.post("/{collection_id}/companies", response_model=AddCompaniesResponse)
 def add_companies_to_collection(
     collection_id: uuid.UUID,
@@ -96,30 +178,25 @@ def add_companies_to_collection(
     if not collection:
         raise HTTPException(status_code=404, detail="Collection not found")
 
-    # Validate companies exist
-    companies = (
-        db.query(database.Company)
-        .filter(database.Company.id.in_(request.company_ids))
-        .all()
-    )
-    if len(companies) != len(request.company_ids):
+    if not request.company_ids:
+        return AddCompaniesResponse(added_count=0, duplicates_count=0)
+
+    # Validate companies exist; counting is enough, no need to load the rows
+    company_ids = set(request.company_ids)
+    found_count = db.scalar(_count_companies_stmt, {"company_ids": list(company_ids)})
+    if found_count != len(company_ids):
         raise HTTPException(status_code=404, detail="One or more companies not found")
 
-    # Add companies to collection (using INSERT ... ON CONFLICT for duplicate handling)
-    added_count = 0
-    for company_id in request.company_ids:
-        try:
-            association = database.CompanyCollectionAssociation(
-                company_id=company_id,
-                collection_id=collection_id,
-            )
-            db.add(association)
-            db.commit()
-            added_count += 1
-        except IntegrityError:
-            # Company already in collection, skip
-            db.rollback()
-            continue
+    # Add companies to collection in a single statement; ON CONFLICT skips
+    # companies already in the collection and RETURNING reports what was added
+    result = db.execute(
+        _add_companies_stmt,
+        {"collection_id": collection_id, "company_ids": list(company_ids)},
+    )
+    added_count = len(result.fetchall())
+    db.commit()
+    # Membership (and liked status) changed, so every cached collection view is stale
+    response_cache.invalidate("collections")
 
     duplicates_count = len(request.company_ids) - added_count
     return AddCompaniesResponse(added_count=added_count, duplicates_count=duplicates_count)
@@ -144,6 +221,12 @@ def bulk_add_companies_from_collection(
     db: Session = Depends(database.get_db),
 ):
     """Add all companies from a source collection to target collection (background task)."""
+    # Copying a collection into itself would only conflict on every row
+    if request.source_collection_id == collection_id:
+        raise HTTPException(
+            status_code=400, detail="Source and target collections are the same"
+        )
+
     # Validate both collections exist
     target_collection = db.query(database.CompanyCollection).get(collection_id)
     if not target_collection:
@@ -182,75 +265,137 @@ def bulk_add_companies_from_collection(
     return BulkAddResponse(task_id=task.id, estimated_count=company_count)
 
 
-def _bulk_add_companies_background(
+# Copies the next keyset page of the source collection into the target entirely
+# server-side, so company IDs never round-trip through Python. Reports the last
+# company_id seen (the cursor for the next page), how many source rows the page
+# covered and how many were actually inserted.
+_bulk_copy_batch_stmt = text(
+    """
+    WITH batch AS (
+        SELECT company_id
+        FROM company_collection_associations
+        WHERE collection_id = :source_collection_id
+          AND company_id > :after_company_id
+        ORDER BY company_id
+        LIMIT :batch_size
+    ),
+    inserted AS (
+        INSERT INTO company_collection_associations (company_id, collection_id)
+        SELECT company_id, CAST(:target_collection_id AS uuid) FROM batch
+        ON CONFLICT (company_id, collection_id) DO NOTHING
+        RETURNING company_id
+    )
+    SELECT
+        (SELECT max(company_id) FROM batch) AS last_company_id,
+        (SELECT count(*) FROM batch) AS batch_count,
+        (SELECT count(*) FROM inserted) AS added_count
+    """
+).bindparams(
+    bindparam("source_collection_id", type_=UUID(as_uuid=True)),
+    bindparam("target_collection_id", type_=UUID(as_uuid=True)),
+)
+
+
+async def _bulk_add_companies_background(
     task_id: uuid.UUID,
     source_collection_id: uuid.UUID,
     target_collection_id: uuid.UUID,
 ):
-    """Background task to bulk add companies between collections."""
-    db = database.SessionLocal()
-    try:
-        # Update task to in_progress
-        task_store.update_task(task_id, status=TaskStatus.IN_PROGRESS, current=0)
-
-        # Get all company IDs from source collection
-        company_ids = (
-            db.query(database.CompanyCollectionAssociation.company_id)
-            .filter(
-                database.CompanyCollectionAssociation.collection_id
-                == source_collection_id
-            )
-            .all()
-        )
-        company_ids = [cid[0] for cid in company_ids]
-
-        # Process in batches of 100 for progress updates
-        batch_size = 100
-        total_added = 0
+    """Background task to bulk add companies between collections.
 
-        for i in range(0, len(company_ids), batch_size):
-            batch = company_ids[i : i + batch_size]
-
-            # Use raw SQL for efficient batch insert with conflict handling
-            # This is much faster than individual ORM inserts
-            values = ",".join(
-                [f"({company_id}, '{target_collection_id}')" for company_id in batch]
-            )
-            query = text(
-                f"""
-                INSERT INTO company_collection_associations (company_id, collection_id)
-                VALUES {values}
-                ON CONFLICT (company_id, collection_id) DO NOTHING
-                """
+    Runs on the event loop with an async session, so a long copy doesn't hold a
+    threadpool worker and task polls keep being served while it runs.
+    """
+    async with database.AsyncSessionLocal() as db:
+        try:
+            # Update task to in_progress
+            await task_store.update_task_async(
+                task_id, status=TaskStatus.IN_PROGRESS, current=0
             )
-            result = db.execute(query)
-            db.commit()
 
-            total_added += result.rowcount if result.rowcount else 0
-
-            # Update progress
-            current_progress = min(i + batch_size, len(company_ids))
-            task_store.update_task(
+            # Batches are sized from the measured insert rate to take about a
+            # second each, so progress moves steadily however slow the inserts
+            # are, capped at 1000 rows where multi-row inserts on Postgres stop
+            # getting faster
+            max_batch_size = 1000
+            target_batch_seconds = 1.0
+            batch_size = 100
+            # Commit on elapsed time rather than row count. Inserts here can be
+            # slow (the seeded throttle trigger costs 100ms per row), and an open
+            # transaction hides new rows from the UI, keeps cached views stale and
+            # blocks concurrent adds of the same companies on ON CONFLICT. Every
+            # 2s keeps that window short while fast inserts still share a commit.
+            commit_interval = 2.0
+            last_commit = time.monotonic()
+            # Progress is polled about once a second, so writing it more often
+            # than every 0.25s only adds load on the task store
+            progress_interval = 0.25
+            last_progress_update = time.monotonic()
+            total_processed = 0
+            total_added = 0
+            last_company_id = 0
+
+            while True:
+                batch_started = time.monotonic()
+                batch = (
+                    await db.execute(
+                        _bulk_copy_batch_stmt,
+                        {
+                            "source_collection_id": source_collection_id,
+                            "target_collection_id": target_collection_id,
+                            "after_company_id": last_company_id,
+                            "batch_size": batch_size,
+                        },
+                    )
+                ).one()
+                batch_seconds = time.monotonic() - batch_started
+
+                if not batch.batch_count:
+                    break
+
+                if time.monotonic() - last_commit >= commit_interval:
+                    await db.commit()
+                    response_cache.invalidate("collections")
+                    last_commit = time.monotonic()
+
+                last_company_id = batch.last_company_id
+                total_processed += batch.batch_count
+                total_added += batch.added_count
+
+                # Update progress (the final count is written on completion)
+                now = time.monotonic()
+                if now - last_progress_update >= progress_interval:
+                    last_progress_update = now
+                    await task_store.update_task_async(
+                        task_id,
+                        status=TaskStatus.IN_PROGRESS,
+                        current=total_processed,
+                    )
+
+                if batch.batch_count < batch_size:
+                    break
+
+                rows_per_second = batch.batch_count / max(batch_seconds, 1e-3)
+                batch_size = max(
+                    1, min(max_batch_size, int(rows_per_second * target_batch_seconds))
+                )
+
+            await db.commit()
+            response_cache.invalidate("collections")
+
+            # Mark task as completed
+            duplicates = total_processed - total_added
+            await task_store.update_task_async(
                 task_id,
-                status=TaskStatus.IN_PROGRESS,
-                current=current_progress,
+                status=TaskStatus.COMPLETED,
+                current=total_processed,
+                message=f"Successfully added {total_added} companies ({duplicates} duplicates skipped)",
             )
 
-        # Mark task as completed
-        duplicates = len(company_ids) - total_added
-        task_store.update_task(
-            task_id,
-            status=TaskStatus.COMPLETED,
-            current=len(company_ids),
-            message=f"Successfully added {total_added} companies ({duplicates} duplicates skipped)",
-        )
-
-    except Exception as e:
-        # Mark task as failed
-        task_store.update_task(
-            task_id,
-            status=TaskStatus.FAILED,
-            error=str(e),
-        )
-    finally:
-        db.close()
+        except Exception as e:
+            # Mark task as failed
+            await task_store.update_task_async(
+                task_id,
+                status=TaskStatus.FAILED,
+                error=str(e),
+            )
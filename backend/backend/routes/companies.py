@@ -1,5 +1,7 @@
 from fastapi import APIRouter, Depends, Query
 from pydantic import BaseModel
+from sqlalchemy import Integer, any_, bindparam, select
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.orm import Session
 
 from backend.db import database
@@ -21,6 +23,14 @@ class CompanyBatchOutput(BaseModel):
     total: int
 
 
+# Hot statements are built once at import, with ID lists bound as one integer[]
+_liked_company_ids_stmt = select(database.CompanyCollectionAssociation.company_id).where(
+    database.CompanyCollectionAssociation.company_id
+    == any_(bindparam("company_ids", type_=ARRAY(Integer))),
+    database.CompanyCollectionAssociation.collection_id == bindparam("liked_list_id"),
+)
+
+
 def fetch_companies_with_liked(
     db: Session, company_ids: list[int]
 ) -> list[CompanyOutput]:
@@ -30,25 +40,22 @@ def fetch_companies_with_liked(
         .first()
     )
 
-    liked_associations = (
-        db.query(database.CompanyCollectionAssociation)
-        .filter(database.Company.id.in_(company_ids))
-        .filter(
-            database.CompanyCollectionAssociation.collection_id == liked_list.id,
+    liked_companies = set(
+        db.scalars(
+            _liked_company_ids_stmt,
+            {"company_ids": company_ids, "liked_list_id": liked_list.id},
         )
-        .all()
     )
 
-    liked_companies = {association.company_id for association in liked_associations}
-
     companies = (
         db.query(database.Company).filter(database.Company.id.in_(company_ids)).all()
     )
 
     results = [(company, company.id in liked_companies) for company in companies]
 
+    # Rows come from the DB already typed, so skip per-field validation
     return [
-        CompanyOutput(
+        CompanyOutput.model_construct(
             id=company.id,
             company_name=company.company_name,
             liked=True if liked else False,
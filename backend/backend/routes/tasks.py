@@ -12,9 +12,9 @@ router = APIRouter(
 
 
 @router.get("/{task_id}", response_model=Task)
-def get_task_status(task_id: uuid.UUID):
+async def get_task_status(task_id: uuid.UUID):
     """Get the status of a background task."""
-    task = task_store.get_task(task_id)
+    task = await task_store.get_task_async(task_id)
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
     return task
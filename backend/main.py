@@ -1,9 +1,11 @@
 # app/main.py
 
+import uuid
+
 import randomname
 from fastapi import FastAPI
 from fastapi.concurrency import asynccontextmanager
-from sqlalchemy import text
+from sqlalchemy import insert, select, text
 from sqlalchemy.orm import Session
 from starlette.middleware.cors import CORSMiddleware
 
@@ -24,10 +26,13 @@ async def lifespan(app: FastAPI):
         db.close()
     yield
     # Clean up...
+    await database.async_engine.dispose()
 
 
 app = FastAPI(lifespan=lifespan)
 
+SEED_BATCH_SIZE = 1000
+
 
 def seed_database(db: Session):
     db.execute(text("TRUNCATE TABLE company_collections CASCADE;"))
@@ -51,26 +56,14 @@ def seed_database(db: Session):
     db.add(my_list)
     db.commit()
 
-    associations = [
-        database.CompanyCollectionAssociation(
-            company_id=company.id, collection_id=my_list.id
-        )
-        for company in db.query(database.Company).limit(50000).all()
-    ]
-    db.bulk_save_objects(associations)
+    add_seed_companies_to_collection(db, my_list.id, limit=50000)
     db.commit()
 
     liked_companies = database.CompanyCollection(collection_name="Liked Companies List")
     db.add(liked_companies)
     db.commit()
 
-    associations = [
-        database.CompanyCollectionAssociation(
-            company_id=company.id, collection_id=liked_companies.id
-        )
-        for company in db.query(database.Company).limit(10).all()
-    ]
-    db.bulk_save_objects(associations)
+    add_seed_companies_to_collection(db, liked_companies.id, limit=10)
     db.commit()
 
     companies_to_ignore = database.CompanyCollection(
@@ -79,13 +72,7 @@ def seed_database(db: Session):
     db.add(companies_to_ignore)
     db.commit()
 
-    associations = [
-        database.CompanyCollectionAssociation(
-            company_id=company.id, collection_id=companies_to_ignore.id
-        )
-        for company in db.query(database.Company).limit(50).all()
-    ]
-    db.bulk_save_objects(associations)
+    add_seed_companies_to_collection(db, companies_to_ignore.id, limit=50)
     db.commit()
 
     db.execute(
@@ -111,6 +98,27 @@ EXECUTE FUNCTION throttle_updates();
     db.commit()
 
 
+def add_seed_companies_to_collection(
+    db: Session, collection_id: uuid.UUID, limit: int
+):
+    # Stream company IDs through a server-side cursor and insert them in batches,
+    # rather than loading every Company row into memory first
+    company_ids = db.scalars(
+        select(database.Company.id)
+        .order_by(database.Company.id)
+        .limit(limit)
+        .execution_options(yield_per=SEED_BATCH_SIZE)
+    )
+    for batch in company_ids.partitions():
+        db.execute(
+            insert(database.CompanyCollectionAssociation),
+            [
+                {"company_id": company_id, "collection_id": collection_id}
+                for company_id in batch
+            ],
+        )
+
+
 app.include_router(companies.router)
 app.include_router(collections.router)
 app.include_router(tasks.router)